@@ -24,19 +24,22 @@ import asyncio
 import logging
 import re
 from abc import ABCMeta
-from collections import defaultdict, OrderedDict
-from copy import deepcopy
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from types import SimpleNamespace
 from typing import (
     TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Iterable,
     List,
     Optional,
     Dict,
     Union,
     Any,
-    cast, Tuple
+    Tuple
 )
 from quart import Quart
 
@@ -65,6 +68,16 @@ if TYPE_CHECKING:
     )
 log: logging.Logger = get_logger(__name__)
 
+# the pattern to check whether the plugin is loaded from url or local file
+_PLUGIN_URL_RE = re.compile(
+    r'^(?:http|ftp)s?://'  # http:// or https://
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}'
+    r'\.?|[A-Z0-9-]{2,}\.?)|'
+    r'localhost|'  # localhost...
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
+    r'(?::\d+)?'  # optional port
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+
 
 def _list_routes_txt(app: Quart) -> str:
     """
@@ -79,29 +92,26 @@ def _list_routes_txt(app: Quart) -> str:
     if len(rules) == 0:
         return 'No routes were registered.'
 
-    rules = list(sorted(rules, key=lambda rule: rule.endpoint))
-
     headers = ("Endpoint", "Methods", "Websocket", "Rule")
-    rule_methods = [", ".join(sorted(rule.methods)) for rule in rules if rule.methods]
+    widths = [len(header) for header in headers]
 
-    widths = [
-        max(len(rule.endpoint) for rule in rules),
-        max(len(methods) for methods in rule_methods),
-        len("Websocket"),
-        max(len(rule.rule) for rule in rules),
-    ]
-    widths = [max(len(header), width) for header, width in zip(headers, widths)]
+    # collect the rows and the column widths in one pass
+    rows = []
+    for rule in sorted(rules, key=lambda rule: rule.endpoint):
+        methods = ", ".join(sorted(rule.methods or ()))
+        cells = (rule.endpoint, methods, str(rule.websocket), rule.rule)
+        rows.append(cells)
+        widths = [max(width, len(cell)) for width, cell in zip(widths, cells)]
 
     # pylint: disable=C0209
     row = "{{0:<{0}}} | {{1:<{1}}} | {{2:<{2}}} | {{3:<{3}}}".format(*widths)
 
-    routes_txt = ''
-    routes_txt += row.format(*headers).strip()
-    routes_txt += row.format(*("-" * width for width in widths))
-
-    for rule, methods in zip(rules, rule_methods):
-        routes_txt += row.format(rule.endpoint, methods, str(rule.websocket), rule.rule).rstrip()
-    return routes_txt
+    lines = [
+        row.format(*headers).rstrip(),
+        row.format(*("-" * width for width in widths)),
+    ]
+    lines.extend(row.format(*cells).rstrip() for cells in rows)
+    return '\n'.join(lines)
 
 
 @dataclass
@@ -109,6 +119,10 @@ class WechatyPluginOptions:
     """options for wechaty plugin"""
     name: Optional[str] = None
     metadata: Optional[dict] = None
+    # the events of the plugins in the same dependency layer are emitted
+    # concurrently by default, set it to True if the plugin must also wait for
+    # the plugins registered before it in its layer
+    sequential: bool = False
 
 
 class PluginStatus(Enum):
@@ -128,6 +142,9 @@ class WechatyPlugin(metaclass=ABCMeta):
     def __init__(self, options: Optional[WechatyPluginOptions] = None):
         self.output: Dict[str, Any] = {}
         self.bot: Optional[Wechaty] = None
+        # the status is managed by WechatyPluginManager, so that it can keep
+        # its caches of the running plugins up to date
+        self._status: PluginStatus = PluginStatus.Running
         if options is None:
             options = WechatyPluginOptions()
         self.options = options
@@ -140,6 +157,12 @@ class WechatyPlugin(metaclass=ABCMeta):
         """
         self.bot = bot
 
+    @property
+    def status(self) -> PluginStatus:
+        """the running status of the plugin, which is changed by
+        WechatyPluginManager.start_plugin/stop_plugin"""
+        return self._status
+
     async def init_plugin(self, wechaty: Wechaty) -> None:
         """set wechaty to the plugin"""
 
@@ -258,14 +281,21 @@ class WechatyPlugin(metaclass=ABCMeta):
         """
 
     def get_output(self) -> dict:
-        """if necessary , get the output of the plugin"""
-        final_output = deepcopy(self.output)
+        """if necessary , get the output of the plugin
+
+        the output dict is handed over to the caller without copying, and the
+        plugin starts with a new empty output dict.
+        """
+        final_output = self.output
         self.output = {}
         return final_output
 
 
-PluginTree = Dict[str, Union[str, List[str]]]
+PluginTree = Dict[str, List[str]]
+# the layers of named plugins, the plugins in one layer don't depend on each other
+PluginLayers = List[List[WechatyPlugin]]
 EndPoint = Tuple[str, int]
+EventArgsValidator = Callable[[tuple, dict], tuple]
 
 
 def _load_default_plugins() -> List[WechatyPlugin]:
@@ -276,21 +306,285 @@ def _load_default_plugins() -> List[WechatyPlugin]:
     # TODO: to be implemented
 
 
+def _topological_layers(plugins: Dict[str, WechatyPlugin]) -> PluginLayers:
+    """
+    group the plugins into layers with Kahn's algorithm: every plugin is placed
+    in a layer after all of its dependency plugins, so the plugins in the same
+    layer don't depend on each other. The plugins in one layer keep their
+    registration order.
+    Args:
+        plugins: the registered plugins, name -> plugin
+
+    Returns: the layers of sorted plugins
+
+    """
+    in_degree: Dict[str, int] = {name: 0 for name in plugins}
+    dependents: Dict[str, List[str]] = defaultdict(list)
+    for name, plugin in plugins.items():
+        for dependency in plugin.get_dependency_plugins():
+            if dependency not in plugins:
+                raise WechatyPluginError(
+                    f'the dependency plugin <{dependency}> of <{name}> not exist')
+            dependents[dependency].append(name)
+            in_degree[name] += 1
+
+    layer = [name for name, degree in in_degree.items() if degree == 0]
+    layers: PluginLayers = []
+    sorted_count = 0
+    while layer:
+        layers.append([plugins[name] for name in layer])
+        sorted_count += len(layer)
+
+        next_layer = []
+        for name in layer:
+            for dependent in dependents[name]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    next_layer.append(dependent)
+        layer = next_layer
+
+    if sorted_count != len(plugins):
+        cycle_plugins = [name for name, degree in in_degree.items() if degree > 0]
+        raise WechatyPluginError(
+            f'there is a dependency cycle between plugins: {cycle_plugins}')
+    return layers
+
+
+def _filter_layers(layers: PluginLayers,
+                   predicate: Callable[[WechatyPlugin], bool]) -> PluginLayers:
+    """
+    keep the plugins which match the predicate in their layers, and drop the
+    empty layers
+    """
+    filtered_layers = [
+        [plugin for plugin in layer if predicate(plugin)] for layer in layers
+    ]
+    return [layer for layer in filtered_layers if layer]
+
+
+async def _gather_or_cancel(awaitables: Iterable[Awaitable[None]]) -> None:
+    """
+    run the awaitables concurrently, if one of them fails, the others will be
+    cancelled and awaited before re-raising the error, so that no orphaned
+    task is left running.
+    """
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+_USER_TYPES: Optional[SimpleNamespace] = None
+
+
+def _get_user_types() -> SimpleNamespace:
+    """
+    get the User types, they can't be imported at the top of the module because
+    of the circular import, so import them once at the first time of using.
+    """
+    global _USER_TYPES  # pylint: disable=global-statement
+    if _USER_TYPES is None:
+        # pylint: disable=import-outside-toplevel
+        from .user import (
+            Room,
+            RoomInvitation,
+            Friendship,
+            Contact,
+            Message,
+        )
+        _USER_TYPES = SimpleNamespace(
+            Room=Room,
+            RoomInvitation=RoomInvitation,
+            Friendship=Friendship,
+            Contact=Contact,
+            Message=Message,
+        )
+    return _USER_TYPES
+
+
+# the args validators of plugin events, which return the args to call the
+# event method of plugins. The type checking is wrapped in `if __debug__:`
+# blocks, so it's skipped when python is running with `-O`.
+
+def _validate_message(args: tuple, kwargs: dict) -> Tuple[Message]:
+    """validate the args of message event"""
+    # https://stackoverflow.com/a/154156/2544762
+    # The most Pythonic way to check the type of an object is... not to check it.
+    if not args and 'msg' not in kwargs:
+        raise WechatyPluginError(
+            f'the plugin args of message is invalid, the source args:'
+            f'<{args}>, but expected args is message ')
+
+    message = args[0] if args else kwargs['msg']
+    if __debug__:
+        assert isinstance(message, _get_user_types().Message)
+    return (message,)
+
+
+def _validate_friendship(args: tuple, _: dict) -> Tuple[Friendship]:
+    """validate the args of friendship event"""
+    if len(args) != 1:
+        raise WechatyPluginError(
+            f'the plugin args of friendship event is invalid,'
+            f'the source args is <{args}>,'
+            f'but expected args is : Friendship')
+
+    friendship = args[0]
+    if __debug__:
+        assert isinstance(friendship, _get_user_types().Friendship)
+    return (friendship,)
+
+
+def _validate_contact(args: tuple, _: dict) -> Tuple[Contact]:
+    """validate the args of login/logout event"""
+    if len(args) != 1:
+        raise WechatyPluginError(
+            f'the plugin args of login/logout event is invalid,'
+            f'the source args is : <{args}>,'
+            f'but expected args is : Contact ')
+
+    contact = args[0]
+    if __debug__:
+        assert isinstance(contact, _get_user_types().Contact)
+    return (contact,)
+
+
+def _validate_room_invite(args: tuple, _: dict) -> Tuple[RoomInvitation]:
+    """validate the args of room-invite event"""
+    if len(args) != 1:
+        raise WechatyPluginError(
+            f'the plugin args of room-invite event is invalid,'
+            f'the source args is : <{args}>,'
+            f'but expected args is : RoomInvitation ')
+
+    room_invitation = args[0]
+    if __debug__:
+        assert isinstance(room_invitation, _get_user_types().RoomInvitation)
+    return (room_invitation,)
+
+
+def _validate_room_join(args: tuple, _: dict
+                        ) -> Tuple[Room, List[Contact], Contact, datetime]:
+    """validate the args of room-join event"""
+    # there must be four arguments: room, invitees, inviter, date
+    if len(args) != 4:
+        raise WechatyPluginError(
+            f'the plugin args of room-join is invalid, the source args:'
+            f'<{args}>, but expected args is room, invitees, inviter, '
+            f'date')
+
+    room, invitees, inviter, date = args
+    if __debug__:
+        user_types = _get_user_types()
+        assert isinstance(room, user_types.Room)
+        assert isinstance(invitees, list)
+        assert isinstance(inviter, user_types.Contact)
+        assert isinstance(date, datetime)
+    return room, invitees, inviter, date
+
+
+def _validate_room_leave(args: tuple, _: dict
+                         ) -> Tuple[Room, List[Contact], Contact, datetime]:
+    """validate the args of room-leave event"""
+    # there must be four arguments: room, leavers, remover, date
+    if len(args) != 4:
+        raise WechatyPluginError(
+            f'the plugin args of room-leave is invalid, the source args:'
+            f'<{args}>, but expected args is room, leavers, remover, '
+            f'date')
+
+    room, leavers, remover, date = args
+    if __debug__:
+        user_types = _get_user_types()
+        assert isinstance(room, user_types.Room)
+        assert isinstance(leavers, list)
+        assert isinstance(remover, user_types.Contact)
+        assert isinstance(date, datetime)
+    return room, leavers, remover, date
+
+
+def _validate_room_topic(args: tuple, _: dict
+                         ) -> Tuple[Room, str, str, Contact, datetime]:
+    """validate the args of room-topic event"""
+    if len(args) != 5:
+        raise WechatyPluginError(
+            f'the plugin args of room-topic is invalid, the source args:'
+            f'<{args}>, but expected args is room, payload.new_topic,'
+            f'payload.old_topic, changer, date'
+        )
+
+    room, new_topic, old_topic, changer, date = args
+    if __debug__:
+        user_types = _get_user_types()
+        assert isinstance(room, user_types.Room)
+        assert isinstance(new_topic, str)
+        assert isinstance(old_topic, str)
+        assert isinstance(changer, user_types.Contact)
+        assert isinstance(date, datetime)
+    return room, new_topic, old_topic, changer, date
+
+
+def _validate_scan(args: tuple, _: dict) -> Tuple[str, ScanStatus, Optional[str]]:
+    """validate the args of scan event: qr_code, [scan_status, [data]]"""
+    if not 1 <= len(args) <= 3:
+        raise WechatyPluginError(
+            f'the plugin args of scan is invalid, the source args: '
+            f'{args}, but expected args is qr_code, payload.status, '
+            f'payload.data'
+        )
+
+    qr_code = args[0]
+    scan_status = args[1] if len(args) > 1 else ScanStatus.Unknown
+    data = args[2] if len(args) > 2 else None
+    if __debug__:
+        assert isinstance(qr_code, str)
+        assert isinstance(scan_status, ScanStatus)
+    return qr_code, scan_status, data
+
+
+# event_name -> (args validator, the name of the plugin event method)
+_EVENT_DISPATCH: Dict[str, Tuple[EventArgsValidator, str]] = {
+    'message': (_validate_message, 'on_message'),
+    'friendship': (_validate_friendship, 'on_friendship'),
+    'login': (_validate_contact, 'on_login'),
+    'logout': (_validate_contact, 'on_logout'),
+    'room-invite': (_validate_room_invite, 'on_room_invite'),
+    'room-join': (_validate_room_join, 'on_room_join'),
+    'room-leave': (_validate_room_leave, 'on_room_leave'),
+    'room-topic': (_validate_room_topic, 'on_room_topic'),
+    'scan': (_validate_scan, 'on_scan'),
+}
+
+
 class WechatyPluginManager:
     """manage the wechaty plugin, It will support some features."""
 
     def __init__(self, wechaty: Wechaty, endpoint: EndPoint):
-        self._plugins: Dict[str, WechatyPlugin] = OrderedDict()
+        self._plugins: Dict[str, WechatyPlugin] = {}
         self._wechaty: Wechaty = wechaty
-        self._plugin_status: Dict[str, PluginStatus] = {}
-        # plugins can be a topological graph pattern, this feature is not
-        # supported now.
-        self._dependency_tree: PluginTree = defaultdict()
+        # cache of the running plugins grouped by the dependency layers, which
+        # will be rebuilt lazily after the plugins or their status have been
+        # changed
+        self._running_cache: Optional[PluginLayers] = None
+        # event method name -> the running plugins which override the method
+        self._subscribers_cache: Dict[str, PluginLayers] = {}
 
         self.app: Quart = Quart('Wechaty Server')
-        self.dependency_tree: PluginTree = defaultdict()
         self.endpoint: Tuple[str, int] = endpoint
 
+        # the endpoint is fixed after the manager is created
+        host, port = endpoint[0], endpoint[1]
+        prefix = '' if host.startswith('http') else 'http://'
+        self._server_endpoint: str = f'{prefix}{host}:{port}'
+
+        # the User types have been loaded when the manager is created, so
+        # resolve them here rather than during the first event
+        _get_user_types()
+
     # pylint: disable=R1711
     @staticmethod
     def _load_plugin_from_local_file(plugin_path: str) -> Optional[WechatyPlugin]:
@@ -310,15 +604,7 @@ class WechatyPluginManager:
         """add plugin to the manager, if the plugin name exist, it will not to
         be installed"""
         if isinstance(plugin, str):
-            regex = re.compile(
-                r'^(?:http|ftp)s?://'  # http:// or https://
-                r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}'
-                r'\.?|[A-Z0-9-]{2,}\.?)|'
-                r'localhost|'  # localhost...
-                r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-                r'(?::\d+)?'  # optional port
-                r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-            if regex.match(plugin) is None:
+            if _PLUGIN_URL_RE.match(plugin) is None:
                 # load plugin from local file
                 plugin_instance = self._load_plugin_from_local_file(plugin)
             else:
@@ -333,41 +619,89 @@ class WechatyPluginManager:
 
         self._plugins[plugin_instance.name] = plugin_instance
         # default wechaty plugin status is Running
-        self._plugin_status[plugin_instance.name] = PluginStatus.Running
+        self._set_status(plugin_instance, PluginStatus.Running)
 
     def remove_plugin(self, name: str) -> None:
         """remove plugin"""
         if name not in self._plugins:
             raise WechatyPluginError(f'plugin {name} not exist')
         self._plugins.pop(name)
-        self._plugin_status.pop(name)
+        self._invalidate_cache()
 
-    def _check_plugins(self, name: str) -> None:
+    def _check_plugins(self, name: str) -> WechatyPlugin:
         """
-        check the plugins whether
+        check the plugins whether exist, and return the plugin
         """
-        if name not in self._plugins and name not in self._plugin_status:
+        plugin = self._plugins.get(name, None)
+        if plugin is None:
             raise WechatyPluginError(f'plugins <{name}> not exist')
+        return plugin
 
     def stop_plugin(self, name: str) -> None:
         """stop the plugin"""
         log.info('stopping the plugin <%s>', name)
-        self._check_plugins(name)
+        plugin = self._check_plugins(name)
 
-        if self._plugin_status[name] == PluginStatus.Stopped:
+        if plugin.status is PluginStatus.Stopped:
             log.warning('plugins <%s> has stopped', name)
-        self._plugin_status[name] = PluginStatus.Stopped
+        self._set_status(plugin, PluginStatus.Stopped)
 
     def start_plugin(self, name: str) -> None:
         """starting the plugin"""
         log.info('starting the plugin <%s>', name)
-        self._check_plugins(name)
-        self._plugin_status[name] = PluginStatus.Running
+        plugin = self._check_plugins(name)
+        self._set_status(plugin, PluginStatus.Running)
+
+    def _set_status(self, plugin: WechatyPlugin, status: PluginStatus) -> None:
+        """set the status of plugin, and drop the caches of running plugins"""
+        # pylint: disable=protected-access
+        plugin._status = status
+        self._invalidate_cache()
 
     def plugin_status(self, name: str) -> PluginStatus:
         """get the plugin status"""
-        self._check_plugins(name)
-        return self._plugin_status[name]
+        return self._check_plugins(name).status
+
+    @property
+    def dependency_tree(self) -> PluginTree:
+        """get the dependency plugins of all plugins, name -> dependency names"""
+        return {
+            name: list(plugin.get_dependency_plugins())
+            for name, plugin in self._plugins.items()
+        }
+
+    def _invalidate_cache(self) -> None:
+        """the plugins or their status have been changed, so drop the caches"""
+        self._running_cache = None
+        self._subscribers_cache.clear()
+
+    def _running_plugins(self) -> PluginLayers:
+        """
+        get the running plugins grouped by the dependency layers, every plugin
+        is placed in a layer after all of its dependency plugins.
+        """
+        if self._running_cache is None:
+            self._running_cache = _filter_layers(
+                _topological_layers(self._plugins),
+                lambda plugin: plugin.status is PluginStatus.Running
+            )
+        return self._running_cache
+
+    def _subscribers(self, method_name: str) -> PluginLayers:
+        """
+        get the running plugins which override the event method, the default
+        event methods of WechatyPlugin do nothing, so there is no need to call
+        them.
+        """
+        subscribers = self._subscribers_cache.get(method_name, None)
+        if subscribers is None:
+            default_method = getattr(WechatyPlugin, method_name)
+            subscribers = _filter_layers(
+                self._running_plugins(),
+                lambda plugin: getattr(type(plugin), method_name) is not default_method
+            )
+            self._subscribers_cache[method_name] = subscribers
+        return subscribers
 
     @property
     def server_endpoint(self) -> str:
@@ -375,13 +709,7 @@ class WechatyPluginManager:
         send the endpoint of wechaty bot service
         Returns: <host>:<port>, eg: http://0.0.0.0:5000
         """
-        prefix = ''
-        host, port = self.endpoint[0], self.endpoint[1]
-        if not host.startswith('http'):
-            prefix = 'http://'
-
-        url = f'{prefix}{host}:{port}'
-        return url
+        return self._server_endpoint
 
     async def start(self) -> None:
         """
@@ -389,15 +717,27 @@ class WechatyPluginManager:
         """
         log.info('start the plugins ...')
 
-        # 1. init the plugins
-        for name, plugin in self._plugins.items():
-            log.info('init %s-plugin ...', name)
-            assert isinstance(plugin, WechatyPlugin)
-            # set wechaty instance to all of the plugin bot attribute
-
-            plugin.set_bot(self._wechaty)
-            await plugin.init_plugin(self._wechaty)
-            await plugin.blueprint(self.app)
+        # 1. sort the plugins by their dependency plugins, and keep
+        # self._plugins in that order
+        layers = _topological_layers(self._plugins)
+        self._plugins = {
+            plugin.name: plugin for layer in layers for plugin in layer
+        }
+        self._invalidate_cache()
+
+        # 2. init the plugins, the plugins in the same layer don't depend on
+        # each other, so they can be initialized concurrently
+        for layer in layers:
+            for plugin in layer:
+                log.debug('init %s-plugin ...', plugin.name)
+                assert isinstance(plugin, WechatyPlugin)
+                # set wechaty instance to all of the plugin bot attribute
+                plugin.set_bot(self._wechaty)
+
+            await _gather_or_cancel(
+                plugin.init_plugin(self._wechaty) for plugin in layer
+            )
+            await _gather_or_cancel(plugin.blueprint(self.app) for plugin in layer)
         # check the host & port configuration
 
         # pylint: disable=W0212
@@ -418,201 +758,65 @@ class WechatyPluginManager:
 
         log.info('============================web service has started========================')
 
-    # pylint: disable=too-many-locals,too-many-statements,too-many-branches
     async def emit_events(self, event_name: str, *args: Any, **kwargs: Any) -> None:
         """
-        during the try-stage, only support message_events
+        emit the puppet event to all of the running plugins
 
         event_name: get event
         event_payload:
         """
+        # skip the whole dispatch when there is no running plugin
+        if not self._running_plugins():
+            return
+
+        entry = _EVENT_DISPATCH.get(event_name, None)
+        if entry is None:
+            raise WechatyPluginError(
+                f'event <{event_name}> is not supported by wechaty plugin')
+
+        validator, method_name = entry
+        subscribers = self._subscribers(method_name)
+        # skip the validation of args when no plugin listens to the event
+        if not subscribers:
+            return
+
+        call_args = validator(args, kwargs)
+
+        # the layers are emitted one by one, so the plugins always run after
+        # their dependency plugins. The plugins in one layer are emitted
+        # concurrently, except the sequential plugins which must wait for all
+        # of the plugins before it.
+        debug_enabled = log.isEnabledFor(logging.DEBUG)
+        for layer in subscribers:
+            batch: List[WechatyPlugin] = []
+            for plugin in layer:
+                if debug_enabled:
+                    log.debug('emit %s-plugin <%s> ...', plugin.name, event_name)
+                if plugin.options.sequential:
+                    await self._gather_plugins(batch, method_name, call_args)
+                    batch = []
+                    await self._gather_plugins([plugin], method_name, call_args)
+                else:
+                    batch.append(plugin)
+            await self._gather_plugins(batch, method_name, call_args)
 
-        # import the User types locally
-        # pylint: disable=import-outside-toplevel
-        from .user import (
-            Room,
-            RoomInvitation,
-            Friendship,
-            Contact,
-            Message,
+    @staticmethod
+    async def _gather_plugins(plugins: List[WechatyPlugin],
+                              method_name: str, call_args: tuple) -> None:
+        """run the event method of plugins concurrently, the exception of one
+        plugin will not break the others"""
+        if not plugins:
+            return
+        results = await asyncio.gather(
+            *(getattr(plugin, method_name)(*call_args) for plugin in plugins),
+            return_exceptions=True
         )
-
-        if event_name == 'message':
-            # https://stackoverflow.com/a/154156/2544762
-            # The most Pythonic way to check the type of an object is... not to check it.
-            if not args and 'msg' not in kwargs:
-                raise WechatyPluginError(
-                    f'the plugin args of message is invalid, the source args:'
-                    f'<{args}>, but expected args is message ')
-
-            message = args[0]
-            assert isinstance(message, Message)
-
-            # this will make the plugins running sequential, _plugins
-            # is a sort dict
-            for name, plugin in self._plugins.items():
-                log.info('emit %s-plugin ...', name)
-                if self.plugin_status(name) == PluginStatus.Running:
-                    await plugin.on_message(message)
-
-        elif event_name == 'friendship':
-            if not args or len(args) != 1:
-                raise WechatyPluginError(
-                    f'the plugin args of friendship event is invalid,'
-                    f'the source args is <{args}>,'
-                    f'but expected args is : Friendship')
-
-            friendship = args[0]
-            assert isinstance(friendship, Friendship)
-
-            for name, plugin in self._plugins.items():
-                log.info('emit %s-plugin ...', name)
-                if self.plugin_status(name) == PluginStatus.Running:
-                    await plugin.on_friendship(friendship)
-
-        elif event_name == 'login':
-            if not args or len(args) != 1:
-                raise WechatyPluginError(
-                    f'the plugin args of login event is invalid,'
-                    f'the source args is : <{args}>,'
-                    f'but expected args is : Contact ')
-
-            contact = args[0]
-            assert isinstance(contact, Contact)
-
-            for name, plugin in self._plugins.items():
-                log.info('emit %s-plugin ...', name)
-                if self.plugin_status(name) == PluginStatus.Running:
-                    await plugin.on_login(contact)
-
-        elif event_name == 'room-invite':
-            if not args or len(args) != 1:
-                raise WechatyPluginError(
-                    f'the plugin args of room-invite event is invalid,'
-                    f'the source args is : <{args}>,'
-                    f'but expected args is : RoomInvitation ')
-
-            room_invitation = args[0]
-            assert isinstance(room_invitation, RoomInvitation)
-
-            for name, plugin in self._plugins.items():
-                log.info('emit %s-plugin ...', name)
-                if self.plugin_status(name) == PluginStatus.Running:
-                    await plugin.on_room_invite(room_invitation)
-
-        elif event_name == 'room-join':
-            # there must be four arguments: room, invitees, inviter, date
-            if not args or len(args) != 4:
-                raise WechatyPluginError(
-                    f'the plugin args of room-join is invalid, the source args:'
-                    f'<{args}>, but expected args is room, invitees, inviter, '
-                    f'date')
-
-            # get the parameters of room-join event
-            room = args[0]
-            assert isinstance(room, Room)
-
-            invitees = args[1]
-            assert isinstance(invitees, list)
-            # must convert the type of invitees to List[Contact]
-            invitees = cast(List[Contact], invitees)
-
-            inviter = args[2]
-            assert isinstance(inviter, Contact)
-
-            date = args[3]
-            assert isinstance(date, datetime)
-
-            for name, plugin in self._plugins.items():
-                log.info('emit %s-plugin ...', name)
-                if self.plugin_status(name) == PluginStatus.Running:
-                    await plugin.on_room_join(room, invitees, inviter, date)
-
-        elif event_name == 'room-leave':
-            # there must be four arguments: room, leavers, remover, date
-            if not args or len(args) != 4:
-                raise WechatyPluginError(
-                    f'the plugin args of room-join is invalid, the source args:'
-                    f'<{args}>, but expected args is room, invitees, inviter, '
-                    f'date')
-
-            # get the parameters of room-join event
-            room = args[0]
-            assert isinstance(room, Room)
-
-            leavers = args[1]
-            assert isinstance(leavers, list)
-            # must convert the type of leavers to List[Contact]
-            leavers = cast(List[Contact], leavers)
-
-            remover = args[2]
-            assert isinstance(remover, Contact)
-
-            date = args[3]
-            assert isinstance(date, datetime)
-
-            for name, plugin in self._plugins.items():
-                log.info('emit %s-plugin ...', name)
-                if self.plugin_status(name) == PluginStatus.Running:
-                    await plugin.on_room_leave(room, leavers, remover, date)
-
-        elif event_name == 'room-topic':
-            if not args or len(args) != 5:
-                raise WechatyPluginError(
-                    f'the plugin args of room-topic is invalid, the source args:'
-                    f'<{args}>, but expected args is room, payload.new_topic,'
-                    f'payload.old_topic, changer, date'
-                )
-            room = args[0]
-            assert isinstance(room, Room)
-
-            new_topic = args[1]
-            assert isinstance(new_topic, str)
-
-            old_topic = args[2]
-            assert isinstance(old_topic, str)
-
-            changer = args[3]
-            assert isinstance(changer, Contact)
-
-            date = args[4]
-            assert isinstance(date, datetime)
-
-            for name, plugin in self._plugins.items():
-                log.info('emit %s-plugin ...', name)
-                if self.plugin_status(name) == PluginStatus.Running:
-                    await plugin.on_room_topic(
-                        room, new_topic, old_topic,
-                        changer, date
-                    )
-
-        elif event_name == 'scan':
-            if not args or len(args) < 0 or len(args) > 3:
-                raise WechatyPluginError(
-                    f'the plugin args of scan is invalid, the source args: '
-                    f'{args}, but expected args is payload_status, '
-                    f'qr_code, payload.data'
-                )
-
-            qr_code = args[0]
-            assert isinstance(qr_code, str)
-
-            scan_status = args[1]
-            assert isinstance(scan_status, str)
-
-            # pylint: disable=isinstance-second-argument-not-valid-type
-            # assert isinstance(qr_code, Tuple[None, Type[str]])
-
-            data = args[2]
-            data = cast(Optional[str], data)
-
-            # # pylint: disable=isinstance-second-argument-not-valid-type
-            # assert isinstance(data, (None, str))
-
-            for name, plugin in self._plugins.items():
-                log.info('emit %s-plugin ...', name)
-                if self.plugin_status(name) == PluginStatus.Running:
-                    await plugin.on_scan(
-                        qr_code,
-                        scan_status, data
-                    )
+        for plugin, result in zip(plugins, results):
+            if not isinstance(result, BaseException):
+                continue
+            # CancelledError and the other non-Exception errors must not be
+            # swallowed by the plugins
+            if not isinstance(result, Exception):
+                raise result
+            log.error('%s-plugin failed on <%s>: %s', plugin.name, method_name, result,
+                      exc_info=result)
@@ -0,0 +1,305 @@
+"""
+Unit test
+"""
+# pylint: disable=protected-access
+import asyncio
+from typing import Any, Dict, List, Optional, cast
+
+import pytest
+from wechaty_puppet import ScanStatus
+
+from wechaty.exceptions import WechatyPluginError
+from wechaty.plugin import (
+    PluginStatus,
+    WechatyPlugin,
+    WechatyPluginManager,
+    WechatyPluginOptions,
+    _topological_layers,
+    _validate_scan,
+)
+
+
+class DependencyPlugin(WechatyPlugin):
+    """plugin with configurable dependency plugins"""
+
+    def __init__(self, name: str, dependencies: List[str]):
+        super().__init__(WechatyPluginOptions(name=name))
+        self.dependencies = dependencies
+
+    # pylint: disable=arguments-differ
+    def get_dependency_plugins(self) -> List[str]:  # type: ignore
+        return self.dependencies
+
+
+def _plugins(**dependencies: List[str]) -> Dict[str, WechatyPlugin]:
+    return {
+        name: DependencyPlugin(name, names)
+        for name, names in dependencies.items()
+    }
+
+
+def _layer_names(plugins: Dict[str, WechatyPlugin]) -> List[List[str]]:
+    return [[plugin.name for plugin in layer] for layer in _topological_layers(plugins)]
+
+
+def test_topological_layers_keep_registration_order() -> None:
+    """plugins without dependency keep the registration order"""
+    plugins = _plugins(a=[], b=[], c=[])
+    assert _layer_names(plugins) == [['a', 'b', 'c']]
+
+
+def test_topological_layers_with_dependencies() -> None:
+    """plugins are placed after their dependency plugins, and the plugins in
+    the same layer don't depend on each other"""
+    plugins = _plugins(a=['c'], b=['a', 'c'], c=[], d=[], e=['c'])
+    assert _layer_names(plugins) == [['c', 'd'], ['a', 'e'], ['b']]
+
+
+def test_topological_layers_with_cycle() -> None:
+    """dependency cycle is not allowed"""
+    plugins = _plugins(a=['b'], b=['a'], c=[])
+    with pytest.raises(WechatyPluginError):
+        _topological_layers(plugins)
+
+
+def test_topological_layers_with_missing_dependency() -> None:
+    """dependency plugin must be registered"""
+    plugins = _plugins(a=['not-exist'])
+    with pytest.raises(WechatyPluginError):
+        _topological_layers(plugins)
+
+
+def test_validate_scan_args() -> None:
+    """scan event accepts qr_code with optional status and data"""
+    assert _validate_scan(('qr',), {}) == ('qr', ScanStatus.Unknown, None)
+    assert _validate_scan(('qr', ScanStatus.Waiting), {}) == \
+        ('qr', ScanStatus.Waiting, None)
+    assert _validate_scan(('qr', ScanStatus.Scanned, 'data'), {}) == \
+        ('qr', ScanStatus.Scanned, 'data')
+
+    with pytest.raises(WechatyPluginError):
+        _validate_scan((), {})
+    with pytest.raises(WechatyPluginError):
+        _validate_scan(('qr', ScanStatus.Scanned, 'data', 'extra'), {})
+
+
+class ScanPlugin(WechatyPlugin):
+    """plugin which only listens to the scan event"""
+
+    def __init__(self, name: str):
+        super().__init__(WechatyPluginOptions(name=name))
+        self.qr_codes: List[str] = []
+
+    async def on_scan(self, qr_code: str, status: ScanStatus,
+                      data: Optional[str] = None) -> None:
+        self.qr_codes.append(qr_code)
+
+
+def _manager(*plugins: WechatyPlugin) -> WechatyPluginManager:
+    manager = WechatyPluginManager(cast(Any, None), ('0.0.0.0', 5000))
+    for plugin in plugins:
+        manager.add_plugin(plugin)
+    return manager
+
+
+def test_subscribers_only_contain_overriding_plugins() -> None:
+    """plugins without the event method are not subscribers"""
+    scan_plugin = ScanPlugin('scan')
+    manager = _manager(WechatyPlugin(WechatyPluginOptions(name='noop')), scan_plugin)
+
+    assert manager._subscribers('on_scan') == [[scan_plugin]]
+    assert manager._subscribers('on_message') == []
+
+    manager.stop_plugin('scan')
+    assert manager._subscribers('on_scan') == []
+
+
+@pytest.mark.asyncio
+async def test_emit_events_to_running_plugins() -> None:
+    """only the running plugins receive the events"""
+    first, second = ScanPlugin('first'), ScanPlugin('second')
+    manager = _manager(first, second)
+
+    await manager.emit_events('scan', 'qr-1')
+    manager.stop_plugin('second')
+    await manager.emit_events('scan', 'qr-2', ScanStatus.Waiting)
+
+    assert first.qr_codes == ['qr-1', 'qr-2']
+    assert second.qr_codes == ['qr-1']
+
+
+@pytest.mark.asyncio
+async def test_stopped_plugin_receives_no_events() -> None:
+    """the status can only be changed by the manager, so the cache of running
+    plugins can't be stale"""
+    plugin = ScanPlugin('scan')
+    manager = _manager(plugin)
+
+    await manager.emit_events('scan', 'qr-1')
+    with pytest.raises(AttributeError):
+        plugin.status = PluginStatus.Stopped  # type: ignore
+    manager.stop_plugin('scan')
+    await manager.emit_events('scan', 'qr-2')
+
+    assert plugin.status is PluginStatus.Stopped
+    assert manager.plugin_status('scan') is PluginStatus.Stopped
+    assert plugin.qr_codes == ['qr-1']
+
+    manager.start_plugin('scan')
+    await manager.emit_events('scan', 'qr-3')
+    assert plugin.qr_codes == ['qr-1', 'qr-3']
+
+
+class RecordPlugin(DependencyPlugin):
+    """plugin which records the start and the end of its init_plugin and
+    on_scan hooks"""
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, name: str, records: List[str],
+                 dependencies: Optional[List[str]] = None,
+                 sequential: bool = False, error: bool = False,
+                 wait_for: Optional[asyncio.Event] = None):
+        super().__init__(name, dependencies or [])
+        self.options.sequential = sequential
+        self.records = records
+        self.error = error
+        self.wait_for = wait_for
+        self.finished = asyncio.Event()
+
+    async def _record(self) -> None:
+        self.records.append(f'start-{self.name}')
+        try:
+            if self.wait_for is None:
+                # give the other coroutines a chance to run
+                await asyncio.sleep(0)
+            else:
+                await self.wait_for.wait()
+        except asyncio.CancelledError:
+            self.records.append(f'cancel-{self.name}')
+            raise
+        if self.error:
+            raise ValueError(f'{self.name} failed')
+        self.records.append(f'end-{self.name}')
+        self.finished.set()
+
+    async def init_plugin(self, wechaty: Any) -> None:
+        await self._record()
+
+    async def on_scan(self, qr_code: str, status: ScanStatus,
+                      data: Optional[str] = None) -> None:
+        await self._record()
+
+
+@pytest.mark.asyncio
+async def test_emit_events_with_failed_plugin() -> None:
+    """the exception of one plugin doesn't stop the others"""
+    records: List[str] = []
+    manager = _manager(
+        RecordPlugin('a', records, error=True),
+        RecordPlugin('b', records),
+    )
+
+    await manager.emit_events('scan', 'qr')
+
+    assert records == ['start-a', 'start-b', 'end-b']
+
+
+@pytest.mark.asyncio
+async def test_emit_events_with_sequential_plugin() -> None:
+    """sequential plugin waits for the plugins before it and blocks the others"""
+    records: List[str] = []
+    manager = _manager(
+        RecordPlugin('a', records),
+        RecordPlugin('b', records, sequential=True),
+        RecordPlugin('c', records),
+    )
+
+    await manager.emit_events('scan', 'qr')
+
+    assert records == ['start-a', 'end-a', 'start-b', 'end-b', 'start-c', 'end-c']
+
+
+@pytest.mark.asyncio
+async def test_emit_events_with_cancelled_plugin() -> None:
+    """CancelledError of plugin is not swallowed"""
+    records: List[str] = []
+
+    class CancelledPlugin(RecordPlugin):
+        """plugin which is cancelled"""
+        async def on_scan(self, qr_code: str, status: ScanStatus,
+                          data: Optional[str] = None) -> None:
+            raise asyncio.CancelledError()
+
+    manager = _manager(CancelledPlugin('a', records), RecordPlugin('b', records))
+    with pytest.raises(asyncio.CancelledError):
+        await manager.emit_events('scan', 'qr')
+
+
+@pytest.mark.asyncio
+async def test_emit_events_by_dependency_layers() -> None:
+    """dependent plugin receives the event after its dependency plugins
+    finished handling it"""
+    records: List[str] = []
+    plugin_a = RecordPlugin('a', records)
+
+    class DependentPlugin(RecordPlugin):
+        """plugin which checks whether its dependency has finished"""
+        async def on_scan(self, qr_code: str, status: ScanStatus,
+                          data: Optional[str] = None) -> None:
+            assert plugin_a.finished.is_set()
+            await super().on_scan(qr_code, status, data)
+
+    # the dependent plugin is registered before its dependency plugin
+    manager = _manager(
+        DependentPlugin('b', records, dependencies=['a']),
+        plugin_a,
+        RecordPlugin('c', records),
+    )
+
+    await manager.emit_events('scan', 'qr')
+
+    assert records == ['start-a', 'start-c', 'end-a', 'end-c', 'start-b', 'end-b']
+
+
+async def _run_task(*_: Any, **__: Any) -> None:
+    """don't start the web service in unit test"""
+
+
+@pytest.mark.asyncio
+async def test_start_inits_plugins_by_layers(monkeypatch: Any) -> None:
+    """dependent plugin is initialized after its dependency plugins finished,
+    and the plugins in the same layer are initialized concurrently"""
+    records: List[str] = []
+    plugin_b = RecordPlugin('b', records)
+    manager = _manager(
+        RecordPlugin('c', records, dependencies=['a', 'b']),
+        # a can only finish after b, which is in the same layer
+        RecordPlugin('a', records, wait_for=plugin_b.finished),
+        plugin_b,
+    )
+    monkeypatch.setattr(manager.app, 'run_task', _run_task)
+
+    await asyncio.wait_for(manager.start(), timeout=1)
+
+    assert records == ['start-a', 'start-b', 'end-b', 'end-a', 'start-c', 'end-c']
+    assert list(manager._plugins) == ['a', 'b', 'c']
+
+
+@pytest.mark.asyncio
+async def test_start_cancels_plugins_when_init_failed(monkeypatch: Any) -> None:
+    """when the init of one plugin failed, the others in the same layer are
+    cancelled, and the next layers are not initialized"""
+    records: List[str] = []
+    manager = _manager(
+        RecordPlugin('a', records, error=True),
+        # b will never finish by itself
+        RecordPlugin('b', records, wait_for=asyncio.Event()),
+        RecordPlugin('c', records, dependencies=['b']),
+    )
+    monkeypatch.setattr(manager.app, 'run_task', _run_task)
+
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(manager.start(), timeout=1)
+
+    # b has been cancelled and awaited before start() raised the error
+    assert records == ['start-a', 'start-b', 'cancel-b']